@@ -1119,7 +1119,7 @@ def mirrorPose(flip=False, nodes=None):
             "the correct object to mirror for {}".format(oSel.name()))
         import traceback
         traceback.print_exc()
-        print e
+        print(e)
 
     finally:
         pm.undoInfo(cck=1)
@@ -2182,7 +2182,7 @@ class SpineIkFkTransfer(AbstractAnimationTransfer):
         # when getAttr over time, it warns of a cycle
         if versions.current() <= 20180200:
             pm.cycleCheck(e=False)
-            print "Maya version older than: 2018.02"
+            print("Maya version older than: 2018.02")
 
         # create a dict of every frame, and every node involved on that frame
         matchMatrix_dict = {}
@@ -2197,7 +2197,7 @@ class SpineIkFkTransfer(AbstractAnimationTransfer):
         pm.cutKey(fkControls, at=channels, time=(startFrame, endFrame))
         pm.cutKey(ikControls, at=channels, time=(startFrame, endFrame))
 
-        for frame, matchDict in matchMatrix_dict.iteritems():
+        for frame, matchDict in matchMatrix_dict.items():
             pm.currentTime(frame)
             transferFunc(fkControls,
                          ikControls,
@@ -2211,4 +2211,4 @@ class SpineIkFkTransfer(AbstractAnimationTransfer):
         # re enable cycle check
         if versions.current() <= 20180200:
             pm.cycleCheck(e=True)
-            print "CycleCheck turned back ON"
+            print("CycleCheck turned back ON")
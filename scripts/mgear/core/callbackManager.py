@@ -64,7 +64,7 @@ def removeAllSessionCB():
     """Remove all the callbacks created in this session, provided they are in
     the RECORDED_CALLBACKS dict
     """
-    [removeCB(cb) for cb in RECORDED_CALLBACKS.keys()]
+    [removeCB(cb) for cb in list(RECORDED_CALLBACKS.keys())]
 
 
 def removeCBviaMayaID(mayaID, callback_info=RECORDED_CALLBACKS):
@@ -75,7 +75,7 @@ def removeCBviaMayaID(mayaID, callback_info=RECORDED_CALLBACKS):
         mayaID (long): maya point to a callback
         callback_info (dict, optional): remove it from desired cb recorder
     """
-    for callback_name, callback_id in RECORDED_CALLBACKS.iteritems():
+    for callback_name, callback_id in list(RECORDED_CALLBACKS.items()):
         if callback_id == mayaID:
             removeCB(callback_name, callback_info=callback_info)
 
@@ -112,7 +112,7 @@ def removeNamespaceCB(namespace):
     Args:
         namespace (str): uuid or other type of namespace
     """
-    for cb in RECORDED_CALLBACKS.keys():
+    for cb in list(RECORDED_CALLBACKS.keys()):
         if cb.startswith(namespace):
             removeCB(cb)
 
@@ -259,6 +259,22 @@ def userTimeChangedCB(callback_name, func):
     return callback_id
 
 
+@registerSessionCB
+def connectionChangedCB(callback_name, func):
+    """ANYTIME a connection is made or broken, call the provided function
+
+    Args:
+        callback_name (str): name you want to assign cb
+        func (function): will be called upon with the source plug, the
+            destination plug and if the connection was made
+
+    Returns:
+        long: maya id to created callback
+    """
+    callback_id = om.MDGMessage.addConnectionCallback(func)
+    return callback_id
+
+
 @registerSessionCB
 def sampleCallback(callback_name, func):
     """argument order is important. Callback_name and func must always be first
@@ -378,7 +394,7 @@ class CallbackManager(object):
         Args:
             callback_name (str): name
         """
-        for callback_id in self.MANAGER_CALLBACKS.keys():
+        for callback_id in list(self.MANAGER_CALLBACKS.keys()):
             if callback_id.endswith(callback_name):
                 removeCB(callback_id, callback_info=self.MANAGER_CALLBACKS)
                 removeCB(callback_id)
@@ -470,3 +486,8 @@ class CallbackManager(object):
     def userTimeChangedCB(self, callback_name, func):
         callback_id = userTimeChangedCB(callback_name, func)
         return callback_id
+
+    @registerManagerCB
+    def connectionChangedCB(self, callback_name, func):
+        callback_id = connectionChangedCB(callback_name, func)
+        return callback_id
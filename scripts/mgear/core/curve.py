@@ -6,12 +6,15 @@
 # GLOBAL
 #############################################
 from functools import wraps
+from collections import defaultdict
+from collections import OrderedDict
 import pymel.core as pm
 from pymel.core import datatypes
 import json
 import maya.mel as mel
+import maya.cmds as cmds
 
-import maya.OpenMaya as om
+import maya.api.OpenMaya as om2
 
 from mgear.core import applyop
 from mgear.core import utils
@@ -34,14 +37,12 @@ def addCnsCurve(parent, name, centers, degree=1):
     Returns:
         dagNode: The newly created curve.
     """
-    # rebuild list to avoid input list modification
-    centers = centers[:]
-    if degree == 3:
-        if len(centers) == 2:
-            centers.insert(0, centers[0])
-            centers.append(centers[-1])
-        elif len(centers) == 3:
-            centers.append(centers[-1])
+    # cubic curves need at least 4 drivers, so the end centers are repeated.
+    # The padded list is a new list, the input list is not modified
+    if degree == 3 and len(centers) == 2:
+        centers = [centers[0], centers[0], centers[1], centers[1]]
+    elif degree == 3 and len(centers) == 3:
+        centers = [centers[0], centers[1], centers[2], centers[2]]
 
     points = [datatypes.Vector() for center in centers]
 
@@ -88,6 +89,55 @@ def addCurve(parent,
     return node
 
 
+def get_curve_fn(crv):
+    """Get the OpenMaya 2.0 curve function set from a given curve
+
+    Arguments:
+        crv (dagNode or str): The curve transform or shape.
+
+    Returns:
+        MFnNurbsCurve: The curve function set.
+    """
+    sel = om2.MSelectionList()
+    sel.add(str(crv))
+    dag = sel.getDagPath(0)
+    if dag.apiType() == om2.MFn.kTransform:
+        dag.extendToShape()
+
+    return om2.MFnNurbsCurve(dag)
+
+
+def _get_vertex_positions(vertices):
+    """Get the world position of the given vertices
+
+    The positions are read with a single MItMeshVertex iteration per mesh,
+    instead of one query for each vertex.
+
+    Arguments:
+        vertices (list): Vertices or vertex names. Ranges are supported.
+            exp: ["pCube1.vtx[0:5]", "pCube1.vtx[8]"]
+
+    Returns:
+        OrderedDict: (mesh full path, vertex index) as key and world
+            position (x, y, z) as value
+    """
+    sel = om2.MSelectionList()
+    for v in vertices:
+        sel.add(str(v))
+
+    positions = OrderedDict()
+    for i in range(sel.length()):
+        dag, component = sel.getComponent(i)
+        mesh = dag.fullPathName()
+        it = om2.MItMeshVertex(dag, component)
+        while not it.isDone():
+            p = it.position(om2.MSpace.kWorld)
+            positions[(mesh, it.index())] = (p.x, p.y, p.z)
+            it.next()
+
+    return positions
+
+
 def createCurveFromOrderedEdges(edgeLoop,
                                 startVertex,
                                 name,
@@ -105,34 +155,38 @@ def createCurveFromOrderedEdges(edgeLoop,
     Returns:
         dagNode: The newly created curve.
     """
-    orderedEdges = []
+    # map each vertex to its incident edges, so the loop can be walked in a
+    # single pass from the start vertex
+    vertex_edges = defaultdict(list)
     for e in edgeLoop:
-        if startVertex in e.connectedVertices():
-            orderedEdges.append(e)
-            next = e
-            break
-    count = 0
-    while True:
-        for e in edgeLoop:
-            if e in next.connectedEdges() and e not in orderedEdges:
-                orderedEdges.append(e)
-                next = e
-                pass
-        if len(orderedEdges) == len(edgeLoop):
-            break
-        count += 1
-        if count > 100:
+        for v in e.connectedVertices():
+            vertex_edges[v.index()].append(e)
+
+    visited_edges = set()
+    visited_vertex = set([startVertex.index()])
+    orderedVertex = [startVertex.index()]
+    current = startVertex.index()
+    while len(visited_edges) < len(edgeLoop):
+        next_edges = [e for e in vertex_edges[current]
+                      if e.index() not in visited_edges]
+        if not next_edges:
             break
+        edge = next_edges[0]
+        visited_edges.add(edge.index())
+        for v in edge.connectedVertices():
+            if v.index() != current:
+                current = v.index()
+                if current not in visited_vertex:
+                    visited_vertex.add(current)
+                    orderedVertex.append(current)
+                break
 
-    # return orderedEdges
-    orderedVertex = [startVertex]
-    orderedVertexPos = [startVertex.getPosition(space='world')]
-    for e in orderedEdges:
-
-        for v in e.connectedVertices():
-            if v not in orderedVertex:
-                orderedVertex.append(v)
-                orderedVertexPos.append(v.getPosition(space='world'))
+    # the edge loop is on a single mesh, so the vertex index is enough
+    positions = dict(
+        (key[1], pos) for key, pos in _get_vertex_positions(
+            pm.polyListComponentConversion(edgeLoop, fe=True, tv=True)
+        ).items())
+    orderedVertexPos = [positions[i] for i in orderedVertex]
 
     crv = addCurve(parent, name, orderedVertexPos, degree=degree)
     return crv
@@ -165,30 +219,34 @@ def createCuveFromEdges(edgeList,
 
     vList = pm.polyListComponentConversion(edgeList, fe=True, tv=True)
 
-    centers = []
-    centersOrdered = []
-    xOrder = []
-    xReOrder = []
-    for x in vList:
-        vtx = pm.PyNode(x)
-        for v in vtx:
-            centers.append(v.getPosition(space='world'))
-            # we use index [0] to order in X axis
-            xOrder.append(v.getPosition(space='world')[axis])
-            xReOrder.append(v.getPosition(space='world')[axis])
-    for x in sorted(xReOrder):
-        i = xOrder.index(x)
-        centersOrdered.append(centers[i])
+    centers = list(_get_vertex_positions(vList).values())
+    # stable sort of the vertex positions along the sorting axis
+    centersOrdered = sorted(centers, key=lambda p: p[axis])
 
     crv = addCurve(parent, name, centersOrdered, degree=degree)
     return crv
 
 
+def _clamped_params(parL, nbPoints):
+    """Get evenly spaced parameters from 0 to the given max parameter
+
+    Arguments:
+        parL (float): The max parameter value.
+        nbPoints (int): Number of parameters.
+
+    Returns:
+        list of float: The parameters.
+    """
+    increment = parL / (nbPoints - 1)
+    # we need to check that the param value never exceed the parL
+    return [min(x * increment, parL) for x in range(nbPoints)]
+
+
 def createCurveFromCurve(srcCrv, name, nbPoints, parent=None):
     """Create a curve from a curve
 
     Arguments:
-        srcCrv (curve): The source curve.
+        srcCrv (curve or str): The source curve.
         name (str): The new curve name.
         nbPoints (int): Number of control points for the new curve.
         parent (dagNode): Parent of the new curve.
@@ -196,20 +254,17 @@ def createCurveFromCurve(srcCrv, name, nbPoints, parent=None):
     Returns:
         dagNode: The newly created curve.
     """
-    if isinstance(srcCrv, str) or isinstance(srcCrv, unicode):
-        srcCrv = pm.PyNode(srcCrv)
-    length = srcCrv.length()
-    parL = srcCrv.findParamFromLength(length)
+    curveFn = get_curve_fn(srcCrv)
+    length = curveFn.length()
+    parL = curveFn.findParamFromLength(length)
+    params = _clamped_params(parL, nbPoints)
+
+    getPointAtParam = curveFn.getPointAtParam
+    kWorld = om2.MSpace.kWorld
     param = []
-    increment = parL / (nbPoints - 1)
-    p = 0.0
-    for x in range(nbPoints):
-        # we need to check that the param value never exceed the parL
-        if p > parL:
-            p = parL
-        pos = srcCrv.getPointAtParam(p, space='world')
-        param.append(pos)
-        p += increment
+    for p in params:
+        pos = getPointAtParam(p, kWorld)
+        param.append((pos.x, pos.y, pos.z))
     crv = addCurve(parent, name, param, close=False, degree=3)
     return crv
 
@@ -225,25 +280,36 @@ def getCurveParamAtPosition(crv, position):
     Returns:
         list: paramenter and curve length
     """
-    point = om.MPoint(position[0], position[1], position[2])
+    return getCurveParamAtPositionFromFn(get_curve_fn(crv), position)
 
-    dag = om.MDagPath()
-    obj = om.MObject()
-    oList = om.MSelectionList()
-    oList.add(crv.name())
-    oList.getDagPath(0, dag, obj)
 
-    curveFn = om.MFnNurbsCurve(dag)
-    length = curveFn.length()
-    crv.findParamFromLength(length)
+def getCurveParamAtPositionFromFn(curveFn, position):
+    """Get curve parameter from a position using a curve function set
 
-    paramUtill = om.MScriptUtil()
-    paramPtr = paramUtill.asDoublePtr()
+    Building the function set once with get_curve_fn avoids the curve
+    lookup when many positions are queried on the same curve.
 
-    point = curveFn.closestPoint(point, paramPtr, 0.001, om.MSpace.kObject)
-    curveFn.getParamAtPoint(point, paramPtr, 0.001, om.MSpace.kObject)
+    Arguments:
+        curveFn (MFnNurbsCurve): The source curve function set.
+        position (list of float): Represents the position in worldSpace
+            exp: [1.4, 3.55, 42.6]
+
+    Returns:
+        list: paramenter and curve length
+
+    Example:
+        .. code-block:: python
 
-    param = paramUtill.getDouble(paramPtr)
+            curveFn = cur.get_curve_fn(upRope)
+            for cv in cvs:
+                oParam, oLength = cur.getCurveParamAtPositionFromFn(curveFn,
+                                                                    cv)
+    """
+    point = om2.MPoint(position[0], position[1], position[2])
+    length = curveFn.length()
+    param = curveFn.closestPoint(point,
+                                 tolerance=0.001,
+                                 space=om2.MSpace.kObject)[1]
 
     return param, length
 
@@ -252,6 +318,9 @@ def findLenghtFromParam(crv, param):
     """
     Find lengtht from a curve parameter
 
+    The length is measured on the world space curve, like the
+    arcLengthDimension node used before
+
     Arguments:
         param (float): The parameter to get the legth
         crv (curve): The source curve.
@@ -267,13 +336,12 @@ def findLenghtFromParam(crv, param):
             u = uLength / oLength
 
     """
-    node = pm.createNode("arcLengthDimension")
-    pm.connectAttr(crv.getShape().attr("worldSpace[0]"),
-                   node.attr("nurbsGeometry"))
-    node.attr("uParamValue").set(param)
-    uLength = node.attr("arcLength").get()
-    pm.delete(node.getParent())
-    return uLength
+    shapeFn = get_curve_fn(crv)
+    plug = shapeFn.findPlug("worldSpace", False).elementByLogicalIndex(
+        shapeFn.getPath().instanceNumber())
+    # the world space geometry keeps the transform scale in the length
+    curveData = plug.asMObject()
+    return om2.MFnNurbsCurve(curveData).findLengthFromParam(param)
 
 
 # ========================================
@@ -309,22 +377,57 @@ def set_color(node, color):
     # on Maya version.
     # version = mgear.core.getMayaver()
 
+    shapes = cmds.listRelatives(str(node), shapes=True, fullPath=True) or []
     if isinstance(color, int):
 
-        for shp in node.listRelatives(shapes=True):
-            shp.setAttr("overrideEnabled", True)
-            shp.setAttr("overrideColor", color)
+        for shp in shapes:
+            cmds.setAttr(shp + ".overrideEnabled", True)
+            cmds.setAttr(shp + ".overrideColor", color)
     else:
-        for shp in node.listRelatives(shapes=True):
-            shp.overrideEnabled.set(1)
-            shp.overrideRGBColors.set(1)
-            shp.overrideColorRGB.set(color[0], color[1], color[2])
+        for shp in shapes:
+            cmds.setAttr(shp + ".overrideEnabled", 1)
+            cmds.setAttr(shp + ".overrideRGBColors", 1)
+            cmds.setAttr(shp + ".overrideColorRGB",
+                         color[0], color[1], color[2],
+                         type="double3")
 
 
 # ========================================
 # Curves IO ==============================
 # ========================================
 
+def _get_world_matrix(node):
+    """Get the world matrix of a node as a flat list
+
+    Args:
+        node (dagNode or str): The node
+
+    Returns:
+        list of float: The 16 values of the world matrix
+    """
+    sel = om2.MSelectionList()
+    sel.add(str(node))
+    m = sel.getDagPath(0).inclusiveMatrix()
+    return [m.getElement(r, c) for r in range(4) for c in range(4)]
+
+
+def _flatten_matrix(m):
+    """Flatten a matrix stored as a list of rows
+
+    Curve data files from previous versions store the transform as 4 rows
+    of 4 values. Flat matrices are returned as they are.
+
+    Args:
+        m (list): The matrix, flat or as a list of rows
+
+    Returns:
+        list of float: The 16 values of the matrix
+    """
+    if isinstance(m[0], (list, tuple)):
+        return [v for row in m for v in row]
+    return m
+
+
 def collect_curve_shapes(crv, rplStr=["", ""]):
     """Collect curve shapes data
 
@@ -346,7 +449,8 @@ def collect_curve_shapes(crv, rplStr=["", ""]):
         knots = list(shape.getKnots())
         form = c_form.key
         form_id = c_form.index
-        pnts = [[cv.x, cv.y, cv.z] for cv in shape.getCVs(space="object")]
+        cvs = get_curve_fn(shape).cvPositions(om2.MSpace.kObject)
+        pnts = [[cv.x, cv.y, cv.z] for cv in cvs]
         shapesDict[shape.name()] = {"points": pnts,
                                     "degree": degree,
                                     "form": form,
@@ -403,8 +507,7 @@ def collect_curve_data(objs, rplStr=["", ""]):
         else:
             crv_parent = None
 
-        m = x.getMatrix(worldSpace=True)
-        crv_transform = m.get()
+        crv_transform = _get_world_matrix(x)
 
         curveDict = {"shapes_names": [],
                      "crv_parent": crv_parent,
@@ -419,7 +522,12 @@ def collect_curve_data(objs, rplStr=["", ""]):
     return curves_dict
 
 
-def crv_parenting(data, crv, rplStr=["", ""], model=None):
+def crv_parenting(data,
+                  crv,
+                  rplStr=["", ""],
+                  model=None,
+                  parents_map=None,
+                  crv_node=None):
     """Parent the new created curves
 
     Args:
@@ -430,12 +538,22 @@ def crv_parenting(data, crv, rplStr=["", ""], model=None):
             [old Name to replace, new name to set]
         model (dagNode, optional): Model top node to help find the correct
             parent, if  several objects with the same name
+        parents_map (dict, optional): parent name as key and the list of
+            nodes matching that name as value. Avoids a scene query per curve
+            when many curves are parented
+        crv_node (dagNode, optional): the new created curve. If None the
+            curve will be searched by name
     """
     crv_dict = data[crv]
     crv_parent = crv_dict["crv_parent"]
+    if not crv_parent:
+        return
     crv_p = None
     crv = crv.replace(rplStr[0], rplStr[1])
-    parents = pm.ls(crv_parent)
+    if parents_map is not None and crv_parent in parents_map:
+        parents = parents_map[crv_parent]
+    else:
+        parents = pm.ls(crv_parent)
     # this will try to find the correct parent by checking the top node
     # in situations where the name is reapet in many places under same
     # hierarchy this method will fail.
@@ -452,7 +570,9 @@ def crv_parenting(data, crv, rplStr=["", ""], model=None):
         pm.displayWarning("This curve"
                           "  can't be parented. Please do it manually or"
                           " review the scene")
-    if crv_p:
+    if crv_p and crv_node:
+        pm.parent(crv_node, crv_p)
+    elif crv_p:
         # we need to ensure that we parent is the new curve.
         crvs = pm.ls(crv)
         if len(crvs) > 1:
@@ -466,6 +586,71 @@ def crv_parenting(data, crv, rplStr=["", ""], model=None):
                   crv_p)
 
 
+_DEFAULT_KNOTS = {}
+
+
+def _default_knots(nb_points, degree):
+    """Get the default knots vector for a number of points and degree
+
+    The knots vectors are cached, since most of the curves in a rig share
+    the same number of points and degree.
+
+    Args:
+        nb_points (int): Number of control points
+        degree (int): The curve degree
+
+    Returns:
+        tuple of int: The knots vector
+    """
+    key = (nb_points, degree)
+    if key not in _DEFAULT_KNOTS:
+        _DEFAULT_KNOTS[key] = tuple(range(nb_points + degree - 1))
+    return _DEFAULT_KNOTS[key]
+
+
+# nurbsCurve data form index by stored form
+_CURVE_FORMS = {"open": 0,
+                "closed": 1,
+                "periodic": 2}
+
+
+def _create_curve_shape(parent, points, knots, degree, form="open"):
+    """Create a NurbsCurve shape under the given transform
+
+    The shape is created in place and its geometry set from the curve data,
+    so the creation can be undone and no temporal node is needed
+
+    Args:
+        parent (dagNode): The transform that will hold the new shape
+        points (list of list of float): The control points positions
+        knots (list of float): The knots vector
+        degree (int): The curve degree
+        form (str, optional): The curve form. open, closed or periodic
+
+    Returns:
+        str: The new shape name
+    """
+    parent_name = parent.longName()
+    shape = cmds.createNode("nurbsCurve",
+                            name=parent_name.split("|")[-1] + "Shape",
+                            parent=parent_name)
+    # the shape name is only unique under its transform
+    shape = "{}|{}".format(parent_name, shape.split("|")[-1])
+    cmds.setAttr(shape + ".cc",
+                 degree,
+                 len(points) - degree,
+                 _CURVE_FORMS[form],
+                 False,
+                 3,
+                 tuple(knots),
+                 len(knots),
+                 len(points),
+                 *[tuple(p) for p in points],
+                 type="nurbsCurve")
+
+    return shape
+
+
 def create_curve_from_data_by_name(crv,
                                    data,
                                    replaceShape=False,
@@ -486,6 +671,9 @@ def create_curve_from_data_by_name(crv,
             [old Name to replace, new name to set]
         model (dagNode, optional): Model top node to help find the correct
             parent, if  several objects with the same name
+
+    Returns:
+        dagNode: The curve
     """
     crv_dict = data[crv]
 
@@ -505,6 +693,14 @@ def create_curve_from_data_by_name(crv,
         first_shape = first_shape[0]
         # clean old shapes
         pm.delete(first_shape.listRelatives(shapes=True))
+    else:
+        nsh = crv.replace(rplStr[0], rplStr[1])
+        first_shape = pm.createNode("transform",
+                                    name=nsh.replace("Shape", ""))
+        cmds.xform(first_shape.name(), matrix=_flatten_matrix(crv_transform))
+
+    # all the shapes are created directly under the same transform, this
+    # handles multiple shapes without temporal nodes
     for sh in crv_dict["shapes_names"]:
         points = shp_dict[sh]["points"]
         form = shp_dict[sh]["form"]
@@ -512,31 +708,15 @@ def create_curve_from_data_by_name(crv,
         if "knots" in shp_dict[sh]:
             knots = shp_dict[sh]["knots"]
         else:
-            knots = range(len(points) + degree - 1)
-        if form != "open":
-            close = True
-        else:
-            close = False
+            knots = _default_knots(len(points), degree)
 
-        # we dont use replace in order to support multiple shapes
-        nsh = crv.replace(rplStr[0], rplStr[1])
-        obj = pm.curve(name=nsh.replace("Shape", ""),
-                       point=points,
-                       periodic=close,
-                       degree=degree,
-                       knot=knots)
-        set_color(obj, color)
-        # handle multiple shapes in the same transform
-        if not first_shape:
-            first_shape = obj
-            first_shape.setTransformation(crv_transform)
-        else:
-            for extra_shp in obj.listRelatives(shapes=True):
-                first_shape.addChild(extra_shp, add=True, shape=True)
-                pm.delete(obj)
+        _create_curve_shape(first_shape, points, knots, degree, form)
+    set_color(first_shape, color)
 
     if rebuildHierarchy:
-        crv_parenting(data, crv, rplStr, model)
+        crv_parenting(data, crv, rplStr, model, crv_node=first_shape)
+
+    return first_shape
 
 
 def create_curve_from_data(data,
@@ -556,17 +736,74 @@ def create_curve_from_data(data,
             hierarchy
     """
 
+    crv_nodes = []
     for crv in data["curves_names"]:
-        create_curve_from_data_by_name(crv,
-                                       data,
-                                       replaceShape,
-                                       rebuildHierarchy=False,
-                                       rplStr=rplStr)
+        crv_nodes.append(create_curve_from_data_by_name(crv,
+                                                        data,
+                                                        replaceShape,
+                                                        rebuildHierarchy=False,
+                                                        rplStr=rplStr))
 
     # parenting
     if rebuildHierarchy:
+        # query each parent name once, many curves usually share the parent
+        parents_map = {}
         for crv in data["curves_names"]:
-            crv_parenting(data, crv, rplStr, model)
+            crv_parent = data[crv]["crv_parent"]
+            if crv_parent and crv_parent not in parents_map:
+                parents_map[crv_parent] = pm.ls(crv_parent)
+
+        for crv, crv_node in zip(data["curves_names"], crv_nodes):
+            crv_parenting(data,
+                          crv,
+                          rplStr,
+                          model,
+                          parents_map=parents_map,
+                          crv_node=crv_node)
+
+
+def _get_connections(node):
+    """Get the incoming and outgoing connections of a node
+
+    Args:
+        node (str): The node name
+
+    Returns:
+        list, list: incoming connections as [source plug, node attribute] and
+            outgoing connections as [node attribute, destination plug]
+    """
+    sel = om2.MSelectionList()
+    sel.add(node)
+    cnx_in = []
+    cnx_out = []
+    for plug in om2.MFnDependencyNode(sel.getDependNode(0)).getConnections():
+        attr = plug.name().split(".", 1)[-1]
+        for src in plug.connectedTo(True, False):
+            cnx_in.append([src.name(), attr])
+        for dst in plug.connectedTo(False, True):
+            cnx_out.append([attr, dst.name()])
+
+    return cnx_in, cnx_out
+
+
+def _disconnect_all(nodes):
+    """Disconnect all the connections of the given nodes
+
+    The disconnections are done with cmds, so they can be undone
+
+    Args:
+        nodes (list of str): The nodes names
+    """
+    # connections between the given nodes are found twice
+    disconnected = set()
+    for node in nodes:
+        cnx_in, cnx_out = _get_connections(node)
+        cnx = [(src, "{}.{}".format(node, attr)) for src, attr in cnx_in]
+        cnx += [("{}.{}".format(node, attr), dst) for attr, dst in cnx_out]
+        for src, dst in cnx:
+            if (src, dst) not in disconnected:
+                disconnected.add((src, dst))
+                cmds.disconnectAttr(src, dst)
 
 
 def update_curve_from_data(data, rplStr=["", ""]):
@@ -597,21 +834,24 @@ def update_curve_from_data(data, rplStr=["", ""]):
 
             # store shapes connections
             shapes = first_shape.listRelatives(shapes=True)
+            cnx_in = []
+            cnx_out = []
             if shapes:
-                cnx = shapes[0].listConnections(plugs=True, c=True)
-                cnx = [[c[1], c[0].shortName()] for c in cnx]
+                cnx_in, cnx_out = _get_connections(shapes[0].name())
                 # Disconnect the conexion before delete the old shapes
-                for s in shapes:
-                    for c in s.listConnections(plugs=True, c=True):
-                        pm.disconnectAttr(c[0])
+                _disconnect_all([s.name() for s in shapes])
                 # clean old shapes
                 pm.delete(shapes)
 
+        new_shapes = []
         for sh in crv_dict["shapes_names"]:
             points = shp_dict[sh]["points"]
             form = shp_dict[sh]["form"]
             degree = shp_dict[sh]["degree"]
-            knots = range(len(points) + degree - 1)
+            if "knots" in shp_dict[sh]:
+                knots = shp_dict[sh]["knots"]
+            else:
+                knots = _default_knots(len(points), degree)
             if form != "open":
                 close = True
             else:
@@ -625,9 +865,7 @@ def update_curve_from_data(data, rplStr=["", ""]):
                            knot=knots)
             set_color(obj, color)
             for extra_shp in obj.listRelatives(shapes=True):
-                # Restore shapes connections
-                for c in cnx:
-                    pm.connectAttr(c[0], extra_shp.attr(c[1]))
+                new_shapes.append(extra_shp)
                 first_shape.addChild(extra_shp, add=True, shape=True)
                 pm.delete(obj)
 
@@ -635,6 +873,16 @@ def update_curve_from_data(data, rplStr=["", ""]):
         for sh in first_shape.getShapes():
             pm.rename(sh, sh.name().replace("ShapeShape", "Shape"))
 
+        # Restore shapes connections. The outgoing connections can only be
+        # driven by one shape, so we restore them from the first new shape
+        for i, extra_shp in enumerate(new_shapes):
+            for src, attr in cnx_in:
+                cmds.connectAttr(src, "{}.{}".format(extra_shp.name(), attr))
+            if i == 0:
+                for attr, dst in cnx_out:
+                    cmds.connectAttr("{}.{}".format(extra_shp.name(), attr),
+                                     dst)
+
 
 def export_curve(filePath=None, objs=None, rplStr=["", ""]):
     """Export the curve data to a json file
@@ -661,10 +909,8 @@ def export_curve(filePath=None, objs=None, rplStr=["", ""]):
             filePath = filePath[0]
 
     data = collect_selected_curve_data(objs, rplStr=rplStr)
-    data_string = json.dumps(data, indent=4, sort_keys=True)
-    f = open(filePath, 'w')
-    f.write(data_string)
-    f.close()
+    with open(filePath, 'w') as f:
+        json.dump(data, f, indent=4, sort_keys=True)
 
 
 def _curve_from_file(filePath=None):
@@ -681,7 +927,8 @@ def _curve_from_file(filePath=None):
         return
     if not isinstance(filePath, basestring):
         filePath = filePath[0]
-    configDict = json.load(open(filePath))
+    with open(filePath) as f:
+        configDict = json.load(f)
 
     return configDict
 
@@ -737,14 +984,16 @@ def keep_point_0_cnx_state(func):
     @wraps(func)
     def wrap(*args, **kwargs):
         crvs = args[0]
-        cnx_dict = {}
+        cnx = []
         for crv in crvs:
-            cnxs = crv.controlPoints[0].listConnections(p=True)
-            if cnxs:
-                cnx_dict[crv.name()] = cnxs[0]
-                pm.disconnectAttr(crv.controlPoints[0])
-            else:
-                cnx_dict[crv.name()] = None
+            plug = "{}.controlPoints[0]".format(crv.getShape().name())
+            src = cmds.listConnections(plug,
+                                       source=True,
+                                       destination=False,
+                                       plugs=True)
+            if src:
+                cmds.disconnectAttr(src[0], plug)
+                cnx.append((src[0], plug))
 
         try:
             return func(*args, **kwargs)
@@ -753,10 +1002,8 @@ def keep_point_0_cnx_state(func):
             raise e
 
         finally:
-            for crv in crvs:
-                src_attr = cnx_dict[crv.name()]
-                if src_attr:
-                    pm.connectAttr(src_attr, crv.controlPoints[0])
+            for src, plug in cnx:
+                cmds.connectAttr(src, plug)
 
     return wrap
 
@@ -817,9 +1064,9 @@ def average_curve(crv,
         if avg_shape:
             # check the number of of points and rebuild to match number in
             # order of make the blendshape
-            crv_len = len(crv.getCVs())
+            crv_len = get_curve_fn(crv).numCVs
             for c in bst:
-                if len(c.getCVs()) == crv_len:
+                if get_curve_fn(c).numCVs == crv_len:
                     bst_filtered.append(c)
                 else:
                     t_c = pm.duplicate(c)[0]
@@ -864,6 +1111,12 @@ def rebuild_curve(crvs, spans):
                         name=name)
 
 
+# modifySelectedCurves MEL commands
+_SMOOTH_MEL = "modifySelectedCurves smooth {0} 0;"
+_STRAIGHTEN_MEL = "modifySelectedCurves straighten {0} {1};"
+_CURL_MEL = "modifySelectedCurves curl {0} {1};"
+
+
 # smooth curve.
 # Lockt lenght needs to be off for smooth correctly
 @utils.one_undo
@@ -871,7 +1124,7 @@ def rebuild_curve(crvs, spans):
 @keep_point_0_cnx_state
 def smooth_curve(crvs, smooth_factor=1):
 
-    mel.eval("modifySelectedCurves smooth {} 0;".format(str(smooth_factor)))
+    mel.eval(_SMOOTH_MEL.format(smooth_factor))
 
 # straight curve.
 # Need to unlock/diconect first point to work.
@@ -883,9 +1136,7 @@ def smooth_curve(crvs, smooth_factor=1):
 @keep_point_0_cnx_state
 def straighten_curve(crvs, straighteness=.1, keep_lenght=1):
 
-    mel.eval(
-        "modifySelectedCurves straighten {0} {1};".format(str(straighteness)),
-        str(keep_lenght))
+    mel.eval(_STRAIGHTEN_MEL.format(straighteness, keep_lenght))
 
 # Curl curve.
 # Need to unlock/diconect first point to work.
@@ -894,9 +1145,7 @@ def straighten_curve(crvs, straighteness=.1, keep_lenght=1):
 
 def curl_curve(crvs, amount=.3, frequency=10):
 
-    mel.eval(
-        "modifySelectedCurves curl {0} {1};".format(str(amount)),
-        str(frequency))
+    mel.eval(_CURL_MEL.format(amount, frequency))
 
 
 # ========================================
@@ -908,10 +1157,12 @@ def set_thickness(crv, thickness=-1):
 
 def lock_first_point(crv):
     # lock first point in the curve
-    mul_mtrx = pm.createNode("multMatrix")
-    dm_node = pm.createNode("decomposeMatrix")
-    pm.connectAttr(crv.worldMatrix[0], mul_mtrx.matrixIn[0])
-    pm.connectAttr(crv.worldInverseMatrix[0], mul_mtrx.matrixIn[1])
-    pm.connectAttr(mul_mtrx.matrixSum, dm_node.inputMatrix)
-    pm.connectAttr(dm_node.outputTranslate,
-                   crv.getShape().controlPoints[0])
+    crv_name = crv.name()
+    mul_mtrx = cmds.createNode("multMatrix")
+    dm_node = cmds.createNode("decomposeMatrix")
+    cmds.connectAttr(crv_name + ".worldMatrix[0]", mul_mtrx + ".matrixIn[0]")
+    cmds.connectAttr(crv_name + ".worldInverseMatrix[0]",
+                     mul_mtrx + ".matrixIn[1]")
+    cmds.connectAttr(mul_mtrx + ".matrixSum", dm_node + ".inputMatrix")
+    cmds.connectAttr(dm_node + ".outputTranslate",
+                     crv.getShape().name() + ".controlPoints[0]")
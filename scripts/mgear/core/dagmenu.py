@@ -8,14 +8,17 @@ click dag menu.
 from __future__ import absolute_import
 
 import os
+import re
 from functools import partial
 
 # Maya imports
 from maya import cmds, mel
+import maya.api.OpenMaya as om2
 import pymel.core as pm
 
 # mGear imports
 import mgear
+from mgear.core import callbackManager
 from mgear.core.anim_utils import reset_all_keyable_attributes
 from mgear.core.pickWalk import get_all_tag_children
 from mgear.core.transform import resetTransform
@@ -30,6 +33,57 @@ from mgear.core.anim_utils import changeSpace
 from mgear.core.anim_utils import getNamespace
 from mgear.core.anim_utils import stripNamespace
 
+# menu post commands set from MEL are unicode in Python 2
+try:
+    _STRING_TYPES = (str, unicode)
+except NameError:
+    _STRING_TYPES = (str,)
+
+# ik controls name tokens and roles, used by _get_controls. "_ikrot" is
+# checked before "_ik" since it contains it
+_IK_ROLE_TOKENS = (("_ikrot", "ik_rot"),
+                   ("_upv", "pole_vector"),
+                   ("_ik", "ik_control"))
+
+# map for non logical components controls, used by the parent switch
+_CONTROL_MAP = {"elbow": "mid",
+                "rot": "orbit",
+                "knee": "mid"}
+
+# ref or Ref suffix of the constrain switch attributes, see _ref_token
+_REF_RE = re.compile(r"[rR]ef")
+
+# mirror and flip menu items: label, flip, all below controls, image
+_MIRROR_MENU_ITEMS = (("Mirror", False, False, "redrawPaintEffects.png"),
+                      ("Mirror all below", False, True, None),
+                      ("Flip", True, False, "redo.png"),
+                      ("Flip all below", True, True, None))
+
+# rig roots long names, see _list_rig_roots
+_RIG_ROOTS_CACHE = {"roots": None}
+# switch controls components attributes and controls by role, see
+# _get_component_ctl and _get_ik_fk_controls_by_role
+_COMPONENT_CTL_CACHE = {}
+_IK_FK_ROLES_CACHE = {}
+# controls tag children, see _get_child_controls, and the name of the
+# connection callback clearing them when a controller tag changes
+_CHILD_CONTROLS_CACHE = {}
+_CHILD_CONTROLS_CALLBACK = "mgear_dagmenu_child_controls"
+
+# Maya's dag menu post command restored by mgear_dagmenu_toggle
+# don't edit any space or syntax here as this is what Maya expects
+_DAG_MENU_POST_MEL = ('menu -edit -postMenuCommand '
+                      '"buildObjectMenuItemsNow {}"{}')
+
+# Maya's dag menus overridden by mgear_dagmenu_toggle and the last state
+# set by run
+_DAG_MENUS = []
+_DAG_MENU_STATE = {"state": None}
+
+# scriptJobs clearing the cached rig data on scene changes
+_SCENE_EVENTS = ("SceneOpened", "NewSceneOpened")
+_SCRIPT_JOBS = []
+
 
 def __change_rotate_order_callback(*args):
     """Wrapper function to call mGears change rotate order function
@@ -59,8 +113,8 @@ def __mirror_flip_pose_callback(*args):
         list: callback from menuItem
     """
 
-    # cast controls into pymel object nodes
-    controls = [pm.PyNode(x) for x in args[0]]
+    # cast controls into pymel object nodes in one call
+    controls = pm.ls(args[0])
 
     # triggers mirror
     # we handle the mirror/flip each control individually even if the function
@@ -94,12 +148,11 @@ def _get_controls(switch_control, blend_attr, comp_ctl_list=None):
     for x in ik_fk_controls["ik_controls"]:
         control_name = x.split(":")[-1]
         # control_type = control_name.split("_")[-2]
-        if "_ik" in control_name.lower():
-            ik_controls["ik_control"] = control_name
-        elif "_upv" in control_name.lower():
-            ik_controls["pole_vector"] = control_name
-        elif "_ikrot" in control_name.lower():
-            ik_controls["ik_rot"] = control_name
+        lower_name = control_name.lower()
+        for token, role in _IK_ROLE_TOKENS:
+            if token in lower_name:
+                ik_controls[role] = control_name
+                break
 
     # - FKS
     fk_controls = [x.split(":")[-1] for x in ik_fk_controls["fk_controls"]]
@@ -108,25 +161,226 @@ def _get_controls(switch_control, blend_attr, comp_ctl_list=None):
     return ik_controls, fk_controls
 
 
-def _is_valid_rig_root(node):
+def _ref_token(switch_attr):
+    """
+    Get the control token of a constrain switch attribute
+    Args:
+        switch_attr: str, ie: "arm_ikref"
+    Returns: str, ie: "ik"
+    """
+    return _REF_RE.split(switch_attr.split("_")[-1], 1)[0]
+
+
+def _get_selected_control():
+    """
+    Get the first selected transform if it is an mGear control
+
+    The selection is read through the API, the transforms names are only
+    queried when the first one has the isCtl attribute. Joints and the
+    other transform types are included
+    Returns: str, [str,]: the control and the selected transforms long
+        names, or None and an empty list
+    """
+    sel_iter = om2.MItSelectionList(om2.MGlobal.getActiveSelectionList(),
+                                    om2.MFn.kTransform)
+    selection = []
+    while not sel_iter.isDone():
+        node = sel_iter.getDependNode()
+        if node.hasFn(om2.MFn.kTransform):
+            if not selection and not om2.MFnDependencyNode(
+                    node).hasAttribute("isCtl"):
+                return None, []
+            selection.append(sel_iter.getDagPath().fullPathName())
+        sel_iter.next()
+    if not selection:
+        return None, []
+    return selection[0], selection
+
+
+def _is_valid_rig_root(long_name):
     """
     Simple exclusion of the buffer nodes and org nodes
     Args:
-        node: str
+        long_name: str, the node long name
     Returns: bool
 
     """
-    short_name = node.split("|")[-1]
-    long_name = cmds.ls(node, l=True)[0]
-    return not (any(["controllers_org" in long_name, "controlBuffer" in short_name]))
+    short_name = long_name.split("|")[-1]
+    return not ("controllers_org" in long_name
+                or "controlBuffer" in short_name)
 
 
-def _list_rig_roots():
+def _list_rig_roots(refresh=False):
     """
     Return all the rig roots in the scene
+
+    The roots are cached, the cache is cleared when a scene is opened or
+    created and when a node can't be matched to the cached roots.
+    Args:
+        refresh: bool, if True will ignore the cached roots
     Returns: [str,]
     """
-    return [n.split(".")[0] for n in cmds.ls("*.is_rig", r=True, l=True) if _is_valid_rig_root(n.split(".")[0])]
+    if refresh or _RIG_ROOTS_CACHE["roots"] is None:
+        _RIG_ROOTS_CACHE["roots"] = [
+            n.split(".")[0] for n in cmds.ls("*.is_rig", r=True, l=True)
+            if _is_valid_rig_root(n.split(".")[0])]
+    return list(_RIG_ROOTS_CACHE["roots"])
+
+
+def _clear_rig_cache(*args):
+    """
+    Clear the cached rig roots, switch controls data and controls tag
+    children
+    """
+    _RIG_ROOTS_CACHE["roots"] = None
+    _COMPONENT_CTL_CACHE.clear()
+    _IK_FK_ROLES_CACHE.clear()
+    _clear_child_controls_cache()
+
+
+def _clear_child_controls_cache(*args):
+    """
+    Clear the cached controls tag children
+    """
+    _CHILD_CONTROLS_CACHE.clear()
+    if _CHILD_CONTROLS_CALLBACK in callbackManager.RECORDED_CALLBACKS:
+        callbackManager.removeCB(_CHILD_CONTROLS_CALLBACK)
+
+
+def _controller_connection_callback(src_plug, dst_plug, made, *args):
+    """
+    Clear the cached controls tag children when a controller tag is
+    connected or disconnected, ie: reparented, created or deleted
+    """
+    for plug in (src_plug, dst_plug):
+        if om2.MFnDependencyNode(plug.node()).typeName == "controller":
+            _clear_child_controls_cache()
+            return
+
+
+def _get_child_controls(control):
+    """
+    Cached version of pickWalk get_all_tag_children
+
+    The connection callback clearing the cache is only registered while
+    the cache is filled, so the rig builds don't run it
+    Args:
+        control: str
+    Returns: [str,]
+    """
+    if control not in _CHILD_CONTROLS_CACHE:
+        if not _CHILD_CONTROLS_CACHE:
+            # recorded by name, this replaces the callback left by a module
+            # reload instead of adding a duplicate
+            callbackManager.connectionChangedCB(
+                _CHILD_CONTROLS_CALLBACK, _controller_connection_callback)
+        _CHILD_CONTROLS_CACHE[control] = get_all_tag_children(control)
+
+    children = _CHILD_CONTROLS_CACHE[control]
+    # filters the deleted controls
+    return cmds.ls(children) if children else []
+
+
+def _get_uuid(node):
+    """
+    Get the node UUID, it is kept when the node is renamed or reparented
+    Args:
+        node: str
+    Returns: str, or None if the node doesn't exist
+    """
+    uuid = cmds.ls(node, uuid=True)
+    return uuid[0] if uuid else None
+
+
+def _get_component_ctl(switch_control, criteria):
+    """
+    Get the component controls attributes of a switch control, cached
+
+    The cache is keyed by the switch control UUID, so a rebuilt rig or a
+    swapped reference isn't matched, and an entry is dropped when one of
+    its attributes doesn't exist anymore
+    Args:
+        switch_control: str
+        criteria: str, listAttr string filter
+    Returns: [str,]
+    """
+    key = (_get_uuid(switch_control), criteria)
+    attrs = _COMPONENT_CTL_CACHE.get(key)
+    if attrs:
+        plugs = ["{}.{}".format(switch_control, a) for a in attrs]
+        if len(cmds.ls(plugs)) == len(plugs):
+            return list(attrs)
+
+    attrs = cmds.listAttr(switch_control, ud=True, string=criteria) or []
+    if key[0] and attrs:
+        _COMPONENT_CTL_CACHE[key] = attrs
+    else:
+        _COMPONENT_CTL_CACHE.pop(key, None)
+    return list(attrs)
+
+
+def _get_ik_fk_controls_by_role(switch_control, comp_ctl_list):
+    """
+    Cached version of anim_utils get_ik_fk_controls_by_role
+
+    The cache is keyed by the switch control UUID and the control list
+    attribute. An entry is dropped when the control list connections
+    changed, so the ctl_role tags are only read again when needed
+    Args:
+        switch_control: str
+        comp_ctl_list: str, attribute containing the control list
+    Returns: dict, [str,]
+    """
+    key = (_get_uuid(switch_control), comp_ctl_list)
+    try:
+        cnxs = sorted(cmds.listConnections(
+            "{}.{}".format(switch_control, comp_ctl_list)) or [])
+    except ValueError:
+        # the control list attribute doesn't exist
+        _IK_FK_ROLES_CACHE.pop(key, None)
+        cnxs = None
+
+    cached = _IK_FK_ROLES_CACHE.get(key)
+    if cached and cached[0] == cnxs:
+        ik_controls, fk_controls = cached[1:]
+    else:
+        ik_controls, fk_controls = get_ik_fk_controls_by_role(
+            switch_control, comp_ctl_list)
+        if key[0] and cnxs:
+            _IK_FK_ROLES_CACHE[key] = (cnxs, ik_controls, fk_controls)
+    return dict(ik_controls), list(fk_controls)
+
+
+def _match_rig_root(long_name, roots):
+    """
+    Find the nearest ancestor of the given long name in the roots
+    Args:
+        long_name: str
+        roots: set of str
+    Returns: str
+    """
+    parts = long_name.split("|")
+    # deepest ancestor first, a rig can be parented under another rig
+    for i in range(len(parts) - 1, 1, -1):
+        ancestor = "|".join(parts[:i])
+        if ancestor in roots:
+            return ancestor
+    return ""
+
+
+def _has_nested_rig_root(long_name, root):
+    """
+    Check if there is a rig root between the node and the given root
+    Args:
+        long_name: str, the node long name
+        root: str, the root long name
+    Returns: bool
+    """
+    parts = long_name.split("|")
+    nested = ["|".join(parts[:i]) + ".is_rig"
+              for i in range(len(root.split("|")) + 1, len(parts))]
+    return any(_is_valid_rig_root(n.split(".")[0])
+               for n in (cmds.ls(nested, l=True) if nested else []))
 
 
 def _find_rig_root(node):
@@ -137,12 +391,13 @@ def _find_rig_root(node):
     Returns: str
     """
     long_name = cmds.ls(node, l=True)[0]
-    roots = _list_rig_roots()
-    for r in roots:
-        if long_name.startswith(r):
-            # this has to be a shortname otherwise IkFkTransfer will fail
-            return r.split("|")[-1]
-    return ""
+    root = _match_rig_root(long_name, set(_list_rig_roots()))
+    if not root or _has_nested_rig_root(long_name, root):
+        # the scene may have changed since the roots were cached
+        root = _match_rig_root(long_name, set(_list_rig_roots(refresh=True)))
+
+    # this has to be a shortname otherwise IkFkTransfer will fail
+    return root.split("|")[-1]
 
 
 def __range_switch_callback(*args):
@@ -169,9 +424,7 @@ def __range_switch_callback(*args):
     # ik_controls, fk_controls = _get_controls(switch_control, blend_attr)
     # search criteria to find all the components sharing the blend
     criteria = blend_attr.replace("_blend", "") + "_id*_ctl_cnx"
-    component_ctl = cmds.listAttr(switch_control,
-                                  ud=True,
-                                  string=criteria)
+    component_ctl = _get_component_ctl(switch_control, criteria)
     if component_ctl:
         ik_list = []
         ikRot_list = []
@@ -180,7 +433,7 @@ def __range_switch_callback(*args):
 
         for com_list in component_ctl:
             # set the initial val for the blend attr in each iteration
-            ik_controls, fk_controls = get_ik_fk_controls_by_role(
+            ik_controls, fk_controls = _get_ik_fk_controls_by_role(
                 switch_control, com_list)
             ik_list.append(ik_controls["ik_control"])
             if ik_controls["ik_rot"]:
@@ -207,8 +460,7 @@ def __reset_attributes_callback(*args):
 
     attribute = args[1]
 
-    for node in args[0]:
-        control = pm.PyNode(node)
+    for control in pm.ls(args[0]):
 
         if attribute == "translate":
             resetTransform(control, t=True, r=False, s=False)
@@ -228,6 +480,21 @@ def __select_host_callback(*args):
     cmds.select(get_host_from_node(args[0]))
 
 
+def __select_all_controls_callback(*args):
+    """ Wrapper function to select all the rig controls of a given control
+
+    The controls set is only queried when the menu item is used
+
+    Args:
+        list: callback from menuItem
+    """
+
+    selection_set = cmds.listConnections(args[0], type="objectSet") or []
+    if not selection_set:
+        return
+    cmds.select(cmds.sets(selection_set, query=True), add=True)
+
+
 def __select_nodes_callback(*args):
     """ Wrapper function to call Maya select command
 
@@ -254,19 +521,16 @@ def __switch_fkik_callback(*args):
 
     # search criteria to find all the components sharing the blend
     criteria = blend_attr.replace("_blend", "") + "_id*_ctl_cnx"
-    component_ctl = cmds.listAttr(switch_control,
-                                  ud=True,
-                                  string=criteria)
+    component_ctl = _get_component_ctl(switch_control, criteria)
     blend_fullname = "{}.{}".format(switch_control, blend_attr)
+    init_val = cmds.getAttr(blend_fullname)
     for i, comp_ctl_list in enumerate(component_ctl):
         # we need to need to set the original blend value for each ik/fk match
-        if i == 0:
-            init_val = cmds.getAttr(blend_fullname)
-        else:
+        if i:
             cmds.setAttr(blend_fullname, init_val)
 
-        ik_controls, fk_controls = get_ik_fk_controls_by_role(switch_control,
-                                                              comp_ctl_list)
+        ik_controls, fk_controls = _get_ik_fk_controls_by_role(
+            switch_control, comp_ctl_list)
 
         # runs switch
         ikFkMatch_with_namespace(namespace=namespace,
@@ -286,18 +550,12 @@ def __switch_parent_callback(*args):
         list: callback from menuItem
     """
 
-    # creates a map for non logical components controls
-    control_map = {"elbow": "mid",
-                   "rot": "orbit",
-                   "knee": "mid"}
-
     # switch_control = args[0].split("|")[-1].split(":")[-1]
     switch_control = args[0].split("|")[-1]
-    uiHost = pm.PyNode(switch_control)  # UiHost is switch PyNode pointer
     switch_attr = args[1]
     switch_idx = args[2]
-    search_token = switch_attr.split("_")[-1].split("ref")[0].split("Ref")[0]
-    print search_token
+    search_token = _ref_token(switch_attr)
+    mapped_token = _CONTROL_MAP.get(search_token)
     target_control = None
 
     # control_01 attr don't standard name ane need to be check
@@ -308,23 +566,23 @@ def __switch_parent_callback(*args):
         attr_name = "_".join(attr_split_name[:-1])
     # search criteria to find all the components sharing the name
     criteria = attr_name + "_id*_ctl_cnx"
-    component_ctl = cmds.listAttr(switch_control,
-                                  ud=True,
-                                  string=criteria)
+    component_ctl = _get_component_ctl(switch_control, criteria)
 
     target_control_list = []
     for comp_ctl_list in component_ctl:
+        comp_controls = cmds.listConnections(
+            "{}.{}".format(switch_control, comp_ctl_list)) or []
 
         # first search for tokens match in all controls. If not token is found
         # we will use all controls for the switch
         # this token match is a filter for components like arms or legs
-        for ctl in uiHost.attr(comp_ctl_list).listConnections():
-            if ctl.ctl_role.get() == search_token:
-                target_control = ctl.stripNamespace()
+        for ctl in comp_controls:
+            ctl_role = cmds.getAttr("{}.ctl_role".format(ctl))
+            if ctl_role == search_token:
+                target_control = stripNamespace(ctl)
                 break
-            elif (search_token in control_map.keys()
-                  and ctl.ctl_role.get() == control_map[search_token]):
-                target_control = ctl.stripNamespace()
+            elif mapped_token and ctl_role == mapped_token:
+                target_control = stripNamespace(ctl)
                 break
 
         if target_control:
@@ -333,9 +591,9 @@ def __switch_parent_callback(*args):
             # token didn't match with any target control. We will add all
             # found controls for the match.
             # This is needed for regular ik match in Control_01
-            for ctl in uiHost.attr(comp_ctl_list).listConnections():
+            for ctl in comp_controls:
 
-                target_control_list.append(ctl.stripNamespace())
+                target_control_list.append(stripNamespace(ctl))
 
     # gets root node for the given control
     namespace_value = args[0].split("|")[-1].split(":")
@@ -344,36 +602,21 @@ def __switch_parent_callback(*args):
     else:
         namespace_value = ""
 
-    root = None
-
-    current_parent = cmds.listRelatives(args[0], fullPath=True, parent=True)
-    if current_parent:
-        current_parent = current_parent[0]
-
-    while not root:
-
-        if cmds.objExists("{}.is_rig".format(current_parent)):
-            root = cmds.ls("{}.is_rig".format(current_parent))[0]
-        else:
-            try:
-                current_parent = cmds.listRelatives(current_parent,
-                                                    fullPath=True,
-                                                    parent=True)[0]
-            except TypeError:
-                break
+    # the rig root ancestor is matched against the cached rig roots instead
+    # of querying each parent
+    root = _find_rig_root(args[0])
 
     if not root or not target_control_list:
         pm.displayInfo("Not root or target control list for space transfer")
         return
 
-    autokey = cmds.listConnections("{}.{}".format(switch_control, switch_attr),
-                                   type="animCurve")
+    switch_plug = "{}.{}".format(switch_control, switch_attr)
+    autokey = cmds.listConnections(switch_plug, type="animCurve")
 
     if autokey:
         for target_control in target_control_list:
             cmds.setKeyframe("{}:{}".format(
-                namespace_value, target_control), "{}.{}"
-                .format(switch_control, switch_attr),
+                namespace_value, target_control), switch_plug,
                 time=(cmds.currentTime(query=True) - 1.0))
 
     # triggers switch
@@ -386,8 +629,7 @@ def __switch_parent_callback(*args):
     if autokey:
         for target_control in target_control_list:
             cmds.setKeyframe("{}:{}".format(
-                namespace_value, target_control), "{}.{}"
-                .format(switch_control, switch_attr),
+                namespace_value, target_control), switch_plug,
                 time=(cmds.currentTime(query=True)))
 
 
@@ -419,6 +661,7 @@ def get_option_var_state():
     # current and following sessions
     if not cmds.optionVar(exists="mgear_dag_menu_OV"):
         cmds.optionVar(intValue=("mgear_dag_menu_OV", 0))
+        return 0
 
     return cmds.optionVar(query="mgear_dag_menu_OV")
 
@@ -430,6 +673,12 @@ def install():
     # get state
     state = get_option_var_state()
 
+    # clear the cached rig data when the scene changes
+    if not _SCRIPT_JOBS:
+        for event in _SCENE_EVENTS:
+            _SCRIPT_JOBS.append(cmds.scriptJob(event=(event,
+                                                      _clear_rig_cache)))
+
     cmds.setParent(mgear.menu_id, menu=True)
     cmds.menuItem("mgear_dagmenu_menuitem", label="mGear Viewport Menu ",
                   command=run, checkBox=state)
@@ -457,15 +706,15 @@ def mgear_dagmenu_callback(*args, **kwargs):  # @UnusedVariable
 
     # if second argument if not a bool then means that we are running
     # the override
-    if type(args[1]) != bool:
-        sel = cmds.ls(selection=True, long=True, exactType="transform")
-        if sel and cmds.objExists("{}.isCtl".format(sel[0])):
+    if not isinstance(args[1], bool):
+        current_control, sel = _get_selected_control()
+        if current_control:
             # cleans menu
             _parent_menu = parent_menu.replace('"', '')
             cmds.menu(_parent_menu, edit=True, deleteAllItems=True)
 
             # fills menu
-            mgear_dagmenu_fill(_parent_menu, sel[0])
+            mgear_dagmenu_fill(_parent_menu, current_control, sel)
         else:
             mel.eval("buildObjectMenuItemsNow " + parent_menu)
 
@@ -473,38 +722,57 @@ def mgear_dagmenu_callback(*args, **kwargs):  # @UnusedVariable
     return parent_menu
 
 
-def mgear_dagmenu_fill(parent_menu, current_control):
+def mgear_dagmenu_fill(parent_menu, current_control, current_selection=None):
     """Fill the given menu with mGear's custom animation menu
 
     Args:
         parent_menu(str): Parent Menu path name
         current_control(str): current selected mGear control
+        current_selection(list, optional): current selected transforms long
+            names. If None the selection will be queried
     """
 
     # gets current selection to use later on
-    _current_selection = cmds.ls(selection=True)
+    if current_selection is None:
+        current_selection = cmds.ls(selection=True, long=True,
+                                    type="transform")
+    _current_selection = current_selection
 
     # get child controls
     child_controls = []
+    seen = set()
     for ctl in _current_selection:
-        [child_controls.append(x)
-         for x in get_all_tag_children(ctl)
-         if x not in child_controls]
+        for x in _get_child_controls(ctl):
+            if x not in seen:
+                seen.add(x)
+                child_controls.append(x)
         # [child_controls.append(x)
         #  for x in get_all_tag_children(cmds.ls(cmds.listConnections(ctl),
         #                                        type="controller"))
         #  if x not in child_controls]
 
-    child_controls.append(current_control)
+    if current_control not in seen:
+        child_controls.append(current_control)
 
-    # handles ik fk blend attributes
+    # gets the ik fk blend and the constrain switch attributes in one scan.
+    # Proxy attributes are skipped
+    blend_attrs = []
+    ref_attrs = []
     for attr in cmds.listAttr(current_control,
                               userDefined=True,
                               keyable=True) or []:
-        if (not attr.endswith("_blend")
-            or cmds.addAttr("{}.{}".format(current_control, attr),
-                            query=True, usedAsProxy=True)):
+        if attr.endswith("_blend"):
+            attrs = blend_attrs
+        elif attr.endswith("ref") or attr.endswith("Ref"):
+            attrs = ref_attrs
+        else:
             continue
+        if not cmds.addAttr(current_control + "." + attr,
+                            query=True, usedAsProxy=True):
+            attrs.append(attr)
+
+    # handles ik fk blend attributes
+    for attr in blend_attrs:
         # found attribute so get current state
         current_state = cmds.getAttr("{}.{}".format(current_control, attr))
         states = {0: "Fk",
@@ -558,10 +826,10 @@ def mgear_dagmenu_fill(parent_menu, current_control):
                                   child_controls))
 
     # add transform resets
-    k_attrs = cmds.listAttr(current_control, keyable=True)
+    k_attrs = set(cmds.listAttr(current_control, keyable=True) or [])
     for attr in ("translate", "rotate", "scale"):
         # checks if the attribute is a maya transform attribute
-        if [x for x in k_attrs if attr in x and len(x) == len(attr) + 1]:
+        if k_attrs.intersection(attr + axis for axis in "XYZ"):
             icon = "{}_M.png".format(attr)
             if attr == "translate":
                 icon = "move_M.png"
@@ -573,85 +841,50 @@ def mgear_dagmenu_fill(parent_menu, current_control):
     # divider
     cmds.menuItem(parent=parent_menu, divider=True)
 
-    # add mirror
-    cmds.menuItem(parent=parent_menu, label="Mirror",
-                  command=partial(__mirror_flip_pose_callback,
-                                  _current_selection,
-                                  False),
-                  image="redrawPaintEffects.png")
-    cmds.menuItem(parent=parent_menu, label="Mirror all below",
-                  command=partial(__mirror_flip_pose_callback,
-                                  child_controls,
-                                  False))
-
-    # add flip
-    cmds.menuItem(parent=parent_menu, label="Flip",
-                  command=partial(__mirror_flip_pose_callback,
-                                  _current_selection,
-                                  True),
-                  image="redo.png")
-    cmds.menuItem(parent=parent_menu, label="Flip all below",
-                  command=partial(__mirror_flip_pose_callback,
-                                  child_controls,
-                                  True))
+    # add mirror and flip
+    for label, flip, all_below, image in _MIRROR_MENU_ITEMS:
+        controls = child_controls if all_below else _current_selection
+        cmds.menuItem(parent=parent_menu, label=label,
+                      command=partial(__mirror_flip_pose_callback,
+                                      controls,
+                                      flip),
+                      **({"image": image} if image else {}))
 
     # divider
     cmds.menuItem(parent=parent_menu, divider=True)
 
     # rotate order
-    if (cmds.getAttr("{}.rotateOrder".format(current_control), channelBox=True)
-        or cmds.getAttr("{}.rotateOrder".format(current_control), keyable=True)
-        and not cmds.getAttr("{}.rotateOrder".format(current_control),
-                             lock=True)):
-        _current_r_order = cmds.getAttr("{}.rotateOrder"
-                                        .format(current_control))
+    ro_plug = "{}.rotateOrder".format(current_control)
+    if (cmds.getAttr(ro_plug, channelBox=True)
+        or cmds.getAttr(ro_plug, keyable=True)
+            and not cmds.getAttr(ro_plug, lock=True)):
+        # the items are only built when the submenu is shown
         _rot_men = cmds.menuItem(parent=parent_menu,
                                  subMenu=True, tearOff=False,
                                  label="Rotate Order switch")
-        cmds.radioMenuItemCollection(parent=_rot_men)
-        orders = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
-        for idx, order in enumerate(orders):
-            if idx == _current_r_order:
-                state = True
-            else:
-                state = False
-            cmds.menuItem(parent=_rot_men, label=order, radioButton=state,
-                          command=partial(__change_rotate_order_callback,
-                                          current_control, order))
+        cmds.menuItem(_rot_men, edit=True, postMenuCommandOnce=True,
+                      postMenuCommand=partial(_fill_rotate_order_menu,
+                                              _rot_men, current_control))
 
     # divider
     cmds.menuItem(parent=parent_menu, divider=True)
 
     # handles constrains attributes (constrain switches)
-    for attr in cmds.listAttr(current_control,
-                              userDefined=True,
-                              keyable=True) or []:
-
-        # filters switch reference attributes
-        if (cmds.addAttr("{}.{}".format(current_control, attr),
-                         query=True, usedAsProxy=True)
-                or not attr.endswith("ref")
-                and not attr.endswith("Ref")):
-            continue
+    for attr in ref_attrs:
 
-        part, ctl = (attr.split("_")[0],
-                     attr.split("_")[-1].split("Ref")[0].split("ref")[0])
+        part, ctl = attr.split("_")[0], _ref_token(attr)
         _p_switch_menu = cmds.menuItem(parent=parent_menu, subMenu=True,
                                        tearOff=False, label="Parent {} {}"
                                        .format(part, ctl),
                                        image="dynamicConstraint.svg")
         cmds.radioMenuItemCollection(parent=_p_switch_menu)
-        k_values = cmds.addAttr("{}.{}".format(current_control, attr),
-                                query=True, enumName=True).split(":")
+        k_values = cmds.attributeQuery(attr, node=current_control,
+                                       listEnum=True)[0].split(":")
         current_state = cmds.getAttr("{}.{}".format(current_control, attr))
 
         for idx, k_val in enumerate(k_values):
-            if idx == current_state:
-                state = True
-            else:
-                state = False
             cmds.menuItem(parent=_p_switch_menu, label=k_val,
-                          radioButton=state,
+                          radioButton=idx == current_state,
                           command=partial(__switch_parent_callback,
                                           current_control, attr, idx, k_val))
 
@@ -659,11 +892,9 @@ def mgear_dagmenu_fill(parent_menu, current_control):
     cmds.menuItem(parent=parent_menu, divider=True)
 
     # select all rig controls
-    selection_set = cmds.ls(cmds.listConnections(current_control),
-                            type="objectSet")
-    all_rig_controls = cmds.sets(selection_set, query=True)
     cmds.menuItem(parent=parent_menu, label="Select all controls",
-                  command=partial(__select_nodes_callback, all_rig_controls))
+                  command=partial(__select_all_controls_callback,
+                                  current_control))
 
     # key all below function
     cmds.menuItem(parent=parent_menu, label="Keyframe child controls",
@@ -671,6 +902,38 @@ def mgear_dagmenu_fill(parent_menu, current_control):
                   image="setKeyframe.png")
 
 
+def _list_dag_menus():
+    """
+    Return the menus that can be Maya's dag menu
+
+    Maya's dag menu is the object popup menu of each model panel, looked
+    up by name. All the menus are listed if none of them is found
+    Returns: [str,]
+    """
+    menus = [panel + "ObjectPop"
+             for panel in cmds.getPanel(type="modelPanel") or []
+             if cmds.menu(panel + "ObjectPop", exists=True)]
+    return menus or cmds.lsUI(menus=True) or []
+
+
+def _fill_rotate_order_menu(rot_menu, control, *args):
+    """Fill the rotate order submenu of the given control
+
+    Args:
+        rot_menu(str): Rotate order submenu path name
+        control(str): mGear control
+    """
+
+    _current_r_order = cmds.getAttr("{}.rotateOrder".format(control))
+    cmds.radioMenuItemCollection(parent=rot_menu)
+    orders = ("xyz", "yzx", "zxy", "xzy", "yxz", "zyx")
+    for idx, order in enumerate(orders):
+        cmds.menuItem(parent=rot_menu, label=order,
+                      radioButton=idx == _current_r_order,
+                      command=partial(__change_rotate_order_callback,
+                                      control, order))
+
+
 def mgear_dagmenu_toggle(state):
     """Set on or off the mgear dag menu override
 
@@ -683,28 +946,39 @@ def mgear_dagmenu_toggle(state):
                       dag menu
     """
 
-    # First loop on Maya menus as Maya's dag menu is a menu
-    for maya_menu in cmds.lsUI(menus=True):
+    # First loop on Maya menus as Maya's dag menu is a menu. To put back
+    # Maya's dag menu we only need the menus overridden by us
+    if state:
+        maya_menus = _list_dag_menus()
+    else:
+        # the menus may have been overridden before the module was loaded
+        # or reloaded, so they are searched again if none was recorded
+        maya_menus = [m for m in _DAG_MENUS if cmds.menu(m, exists=True)]
+        maya_menus = maya_menus or _list_dag_menus()
+        del _DAG_MENUS[:]
+
+    for maya_menu in maya_menus:
 
         # We now get the menu's post command which is a command used for
         # dag menu
         menu_cmd = cmds.menu(maya_menu, query=True, postMenuCommand=True) or []
 
         # If state is set top True then override Maya's dag menu
-        if state and type(menu_cmd) == unicode:
+        if state and isinstance(menu_cmd, _STRING_TYPES):
             if "buildObjectMenuItemsNow" in menu_cmd:
                 # Maya's dag menu post command has the parent menu in it
                 parent_menu = menu_cmd.split(" ")[-1]
                 # Override dag menu with custom command call
                 cmds.menu(maya_menu, edit=True, postMenuCommand=partial(
                           mgear_dagmenu_callback, parent_menu))
+                _DAG_MENUS.append(maya_menu)
 
         # If state is set to False then put back Maya's dag menu
         # This is tricky because Maya's default menu command is a MEL call
         # The override part uses a python function partial call and because of
         # this we need to do some small hack on mGear_dag_menu_callback to give
         # back the default state of Maya's dag menu
-        elif not state and type(menu_cmd) == partial:
+        elif not state and isinstance(menu_cmd, partial):
             # we now check if the command override is one from us
             # here because we override original function we need
             # to get the function name by using partial.func
@@ -715,11 +989,8 @@ def mgear_dagmenu_toggle(state):
                 parent_menu = menu_cmd(state)
 
                 # we set the old mel command
-                # don't edit any space or syntax here as this is what Maya
-                # expects
-                mel.eval('menu -edit -postMenuCommand '
-                         '"buildObjectMenuItemsNow '
-                         + parent_menu.replace('"', '') + '"' + maya_menu)
+                mel.eval(_DAG_MENU_POST_MEL.format(
+                    parent_menu.replace('"', ''), maya_menu))
 
 
 def run(*args, **kwargs):  # @UnusedVariable
@@ -731,12 +1002,21 @@ def run(*args, **kwargs):  # @UnusedVariable
     """
 
     # get check-box state
-    state = args[0]
+    state = bool(args[0])
 
-    if state:
-        cmds.optionVar(intValue=("mgear_dag_menu_OV", 1))
-    else:
-        cmds.optionVar(intValue=("mgear_dag_menu_OV", 0))
+    # nothing to do if the override is already in this state
+    if state == _DAG_MENU_STATE["state"]:
+        return
+    _DAG_MENU_STATE["state"] = state
+
+    # the optionVar is only written when it changes, it is already set
+    # when run from install
+    if cmds.optionVar(query="mgear_dag_menu_OV") != int(state):
+        cmds.optionVar(intValue=("mgear_dag_menu_OV", int(state)))
+
+    # the controls tag children are only cached while the override is on
+    if not state:
+        _clear_child_controls_cache()
 
     # runs dag menu right click mgear's override
     mgear_dagmenu_toggle(state)
@@ -45,17 +45,17 @@ def create(parent=None,
         dagNode: The newly created icon.
 
     """
-    if "w" not in kwargs.keys():
+    if "w" not in kwargs:
         kwargs["w"] = 1
-    if "h" not in kwargs.keys():
+    if "h" not in kwargs:
         kwargs["h"] = 1
-    if "d" not in kwargs.keys():
+    if "d" not in kwargs:
         kwargs["d"] = 1
-    if "po" not in kwargs.keys():
+    if "po" not in kwargs:
         kwargs["po"] = None
-    if "ro" not in kwargs.keys():
+    if "ro" not in kwargs:
         kwargs["ro"] = None
-    if "degree" not in kwargs.keys():
+    if "degree" not in kwargs:
         kwargs["degree"] = 3
 
     if icon == "cube":
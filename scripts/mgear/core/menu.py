@@ -8,31 +8,33 @@ import pymel.core as pm
 from pymel import versions
 
 
+# Skin and Weights submenu items, see install_skinning_menu
+_SKINNING_COMMANDS = (
+    ("Copy Skin", partial(skin.skinCopy, None, None)),
+    ("Select Skin Deformers", skin.selectDeformers),
+    ("-----", None),
+    ("Import Skin", partial(skin.importSkin, None)),
+    ("Import Skin Pack", partial(skin.importSkinPack, None)),
+    ("-----", None),
+    ("Export Skin", partial(skin.exportSkin, None, None)),
+    ("Export Skin Pack Binary", partial(skin.exportSkinPack, None, None)),
+    ("Export Skin Pack ASCII", partial(skin.exportJsonSkinPack,
+                                       None,
+                                       None)),
+    ("-----", None),
+    ("Get Names in gSkin File", partial(skin.getObjsFromSkinFile, None)),
+    ("-----", None),
+    ("Import Deformer Weight Map", partial(wmap.import_weights_selected,
+                                           None)),
+    ("Export Deformer Weight Map", partial(wmap.export_weights_selected,
+                                           None)),
+)
+
+
 def install_skinning_menu():
     """Install Skinning submenu
     """
-    commands = (
-        ("Copy Skin", partial(skin.skinCopy, None, None)),
-        ("Select Skin Deformers", skin.selectDeformers),
-        ("-----", None),
-        ("Import Skin", partial(skin.importSkin, None)),
-        ("Import Skin Pack", partial(skin.importSkinPack, None)),
-        ("-----", None),
-        ("Export Skin", partial(skin.exportSkin, None, None)),
-        ("Export Skin Pack Binary", partial(skin.exportSkinPack, None, None)),
-        ("Export Skin Pack ASCII", partial(skin.exportJsonSkinPack,
-                                           None,
-                                           None)),
-        ("-----", None),
-        ("Get Names in gSkin File", partial(skin.getObjsFromSkinFile, None)),
-        ("-----", None),
-        ("Import Deformer Weight Map", partial(wmap.import_weights_selected,
-                                               None)),
-        ("Export Deformer Weight Map", partial(wmap.export_weights_selected,
-                                               None)),
-    )
-
-    mgear.menu.install("Skin and Weights", commands)
+    mgear.menu.install("Skin and Weights", _SKINNING_COMMANDS)
 
 
 def install_utils_menu(m):
@@ -32,7 +32,7 @@ def get_all_tag_children(node):
         children.extend(child)
         tags = []
         for c in child:
-            tag = cmds.ls(cmds.listConnections(c, type="controller"))
+            tag = cmds.listConnections(c, type="controller") or []
             tags.extend(tag)
             if cmds.listConnections("{}.parent".format(tag[0])) == node:
                 return children
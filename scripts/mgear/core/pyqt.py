@@ -6,18 +6,26 @@
 import os
 import traceback
 import maya.OpenMayaUI as omui
-import pymel.core as pm
+import maya.api.OpenMaya as om2
+from maya import cmds
 from pymel import versions
 
 from mgear.vendor.Qt import QtWidgets
 from mgear.vendor.Qt import QtCompat
 from mgear.vendor.Qt import QtGui
 from mgear.vendor.Qt import QtSvg
+from mgear.vendor.Qt import __binding__ as _QT_BINDING
 
 UI_EXT = "ui"
 
 _LOGICAL_DPI_KEY = "_LOGICAL_DPI"
 
+# qt_import results by shi and cui arguments
+_QT_IMPORT_CACHE = {}
+
+# Maya's main window pointer and wrapper, see maya_main_window
+_MAIN_WINDOW_CACHE = {"ptr": None, "window": None}
+
 #################
 # Old qt importer
 #################
@@ -71,20 +79,28 @@ def qt_import(shi=False, cui=False):
         multi: QtGui, QtCore, QtWidgets, wrapInstance
 
     """
+    key = (shi, cui)
+    if key in _QT_IMPORT_CACHE:
+        return list(_QT_IMPORT_CACHE[key])
+
     lookup = ["PySide2", "PySide", "PyQt4"]
 
+    # the binding already used by Qt.py is tried first, unless another one
+    # is set in the environment
     preferredBinding = os.environ.get("MGEAR_PYTHON_QT_BINDING", None)
-    if preferredBinding is not None and preferredBinding in lookup:
-        lookup.remove(preferredBinding)
-        lookup.insert(0, preferredBinding)
+    for binding in (_QT_BINDING, preferredBinding):
+        if binding is not None and binding in lookup:
+            lookup.remove(binding)
+            lookup.insert(0, binding)
 
     for binding in lookup:
         try:
-            return _qt_import(binding, shi, cui)
+            _QT_IMPORT_CACHE[key] = _qt_import(binding, shi, cui)
+            return list(_QT_IMPORT_CACHE[key])
         except Exception:
             pass
 
-    raise _qt_import("ThisBindingSurelyDoesNotExist", False, False)
+    raise ImportError("No supported python Qt binding found in %s" % lookup)
 
 
 #############################################
@@ -98,8 +114,8 @@ if versions.current() < 20220000:
         """Convert qtDesigner .ui files to .py"""
 
         if not filePath:
-            startDir = pm.workspace(q=True, rootDirectory=True)
-            filePath = pm.fileDialog2(
+            startDir = cmds.workspace(q=True, rootDirectory=True)
+            filePath = cmds.fileDialog2(
                 dialogStyle=2,
                 fileMode=1,
                 startingDirectory=startDir,
@@ -119,7 +135,7 @@ if versions.current() < 20220000:
         pyfile.close()
 
         info = "PyQt Designer file compiled to .py in: "
-        pm.displayInfo(info + compiledFilePath)
+        om2.MGlobal.displayInfo(info + compiledFilePath)
 
 
 def maya_main_window():
@@ -130,8 +146,13 @@ def maya_main_window():
 
     """
 
-    main_window_ptr = omui.MQtUtil.mainWindow()
-    return QtCompat.wrapInstance(long(main_window_ptr), QtWidgets.QWidget)
+    # the wrapper is only created again if the window pointer changes
+    main_window_ptr = int(omui.MQtUtil.mainWindow())
+    if main_window_ptr != _MAIN_WINDOW_CACHE["ptr"]:
+        _MAIN_WINDOW_CACHE["window"] = QtCompat.wrapInstance(
+            main_window_ptr, QtWidgets.QWidget)
+        _MAIN_WINDOW_CACHE["ptr"] = main_window_ptr
+    return _MAIN_WINDOW_CACHE["window"]
 
 
 def showDialog(dialog, dInst=True, dockable=False, *args):
@@ -160,9 +181,9 @@ def showDialog(dialog, dInst=True, dockable=False, *args):
     # ensure clean workspace name
     if hasattr(windw, "toolName") and dockable:
         control = windw.toolName + "WorkspaceControl"
-        if pm.workspaceControl(control, q=True, exists=True):
-            pm.workspaceControl(control, e=True, close=True)
-            pm.deleteUI(control, control=True)
+        if cmds.workspaceControl(control, q=True, exists=True):
+            cmds.workspaceControl(control, e=True, close=True)
+            cmds.deleteUI(control, control=True)
     desktop = QtWidgets.QApplication.desktop()
     screen = desktop.screen()
     screen_center = screen.rect().center()
@@ -324,7 +345,7 @@ def get_logicaldpi():
     Returns:
         int: dpi of the monitor
     """
-    if _LOGICAL_DPI_KEY not in os.environ.keys():
+    if _LOGICAL_DPI_KEY not in os.environ:
         try:
             logical_dpi = maya_main_window().logicalDpiX()
         except Exception:
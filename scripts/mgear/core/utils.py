@@ -111,7 +111,7 @@ def gatherCustomModuleDirectories(envvarkey,
 def getModuleBasePath(directories, moduleName):
     """search component path"""
 
-    for basepath, modules in directories.iteritems():
+    for basepath, modules in directories.items():
         if moduleName in modules:
             # moduleBasePath = os.path.basename(basepath)
             moduleBasePath = basepath
@@ -228,8 +228,8 @@ def timeFunc(func):
         finally:
             end = timeit.default_timer()
             timeConsumed = end - start
-            print "{} time elapsed running {}".format(timeConsumed,
-                                                      func.func_name)
+            print("{} time elapsed running {}".format(timeConsumed,
+                                                      func.__name__))
 
     return wrap
 
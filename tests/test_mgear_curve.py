@@ -0,0 +1,146 @@
+from maya import cmds
+import pymel.core as pm
+
+import mgear.core.curve as curve
+
+from nose.tools import (
+    assert_almost_equal,
+    assert_equal,
+    with_setup,
+)
+
+POINTS = [[0, 0, 0], [1, 1, 0], [2, 0, 0], [3, 1, 0], [4, 0, 0]]
+KNOTS = [0, 0, 0, 1, 2, 2, 2]
+
+
+def source_curves():
+    cmds.file(new=True, force=True)
+
+    crv = pm.curve(name="test_crv", degree=3, point=POINTS, knot=KNOTS)
+    crv.translate.set(1, 2, 3)
+    crv.rotate.set(10, 20, 30)
+    pm.circle(name="test_circle", constructionHistory=False)
+
+
+def source_connected_curve():
+    source_curves()
+
+    # incoming and outgoing shape connections
+    shape = pm.PyNode("test_crv").getShape()
+    driver = pm.createNode("transform", name="driver")
+    pm.connectAttr(driver.translate, shape.controlPoints[0])
+    info = pm.createNode("curveInfo", name="info")
+    pm.connectAttr(shape.worldSpace[0], info.inputCurve)
+
+
+def assert_matrix_equal(node, matrix):
+    for value, expected in zip(cmds.xform(node, q=True, m=True, ws=True),
+                               matrix):
+        assert_almost_equal(value, expected, places=4)
+
+
+@with_setup(source_curves)
+def test_create_curve_from_data_form():
+    """create_curve_from_data restores the curves knots and form"""
+    data = curve.collect_curve_data(pm.ls(["test_crv", "test_circle"]))
+    pm.delete("test_crv", "test_circle")
+    curve.create_curve_from_data(data)
+
+    shape = pm.PyNode("test_crv").getShape()
+    assert_equal(list(shape.getKnots()), KNOTS)
+    assert_equal(shape.form().key, "open")
+    assert_equal(len(shape.getCVs()), len(POINTS))
+    circle_shape = pm.PyNode("test_circle").getShape()
+    assert_equal(circle_shape.form().key, "periodic")
+
+
+@with_setup(source_curves)
+def test_create_curve_from_data_undo():
+    """create_curve_from_data shapes are restored on undo and redo"""
+    data = curve.collect_curve_data(pm.ls("test_crv"))
+    pm.delete("test_crv")
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        curve.create_curve_from_data(data)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    cmds.undo()
+    cmds.redo()
+
+    assert_equal(len(cmds.listRelatives("test_crv", shapes=True)), 1)
+
+
+@with_setup(source_curves)
+def test_create_curve_from_data_matrix():
+    """create_curve_from_data restores the flat stored matrix"""
+    data = curve.collect_curve_data(pm.ls("test_crv"))
+    matrix = data["test_crv"]["crv_transform"]
+    assert_equal(len(matrix), 16)
+
+    pm.delete("test_crv")
+    curve.create_curve_from_data(data)
+
+    assert_matrix_equal("test_crv", matrix)
+
+
+@with_setup(source_curves)
+def test_create_curve_from_data_matrix_rows():
+    """create_curve_from_data reads transforms stored as 4 rows"""
+    data = curve.collect_curve_data(pm.ls("test_crv"))
+    matrix = data["test_crv"]["crv_transform"]
+    data["test_crv"]["crv_transform"] = [matrix[i:i + 4]
+                                         for i in range(0, 16, 4)]
+
+    pm.delete("test_crv")
+    curve.create_curve_from_data(data)
+
+    assert_matrix_equal("test_crv", matrix)
+
+
+@with_setup(source_connected_curve)
+def test_update_curve_from_data_connections():
+    """update_curve_from_data keeps the shape connections"""
+    data = curve.collect_curve_data(pm.ls("test_crv"))
+    curve.update_curve_from_data(data)
+
+    shape = pm.PyNode("test_crv").getShape()
+    assert_equal(
+        cmds.listConnections("{}.controlPoints[0]".format(shape.name()),
+                             source=True, destination=False, plugs=True),
+        ["driver.translate"])
+    assert_equal(
+        cmds.listConnections("info.inputCurve",
+                             source=True, destination=False, shapes=True),
+        [shape.name()])
+
+
+@with_setup(source_curves)
+def test_update_curve_from_data_knots():
+    """update_curve_from_data rebuilds the shape with the stored knots"""
+    data = curve.collect_curve_data(pm.ls("test_crv"))
+    curve.update_curve_from_data(data)
+
+    shape = pm.PyNode("test_crv").getShape()
+    assert_equal(list(shape.getKnots()), KNOTS)
+
+
+@with_setup(source_connected_curve)
+def test_straighten_curve():
+    """straighten_curve runs and keeps the point 0 input"""
+    crv = pm.PyNode("test_crv")
+    pm.select(crv)
+    curve.straighten_curve([crv])
+
+    plug = "{}.controlPoints[0]".format(crv.getShape().name())
+    assert_equal(cmds.listConnections(plug, source=True, destination=False,
+                                      plugs=True),
+                 ["driver.translate"])
+
+
+@with_setup(source_curves)
+def test_curl_curve():
+    """curl_curve runs on the selected curve"""
+    crv = pm.PyNode("test_crv")
+    pm.select(crv)
+    curve.curl_curve([crv])
@@ -0,0 +1,76 @@
+from maya import cmds
+
+import mgear.core.dagmenu as dagmenu
+
+from nose.tools import (
+    assert_equal,
+    assert_false,
+    assert_true,
+    with_setup,
+)
+
+CONTROLS = ("arm_L0_fk1_ctl", "arm_L0_ikRot_ctl", "arm_L0_ik_ctl",
+            "arm_L0_upv_ctl", "arm_L0_fk0_ctl")
+
+
+def source_host():
+    cmds.file(new=True, force=True)
+
+    host = cmds.createNode("transform", name="armUI_L0_ctl")
+    cmds.addAttr(host, longName="arm_ctl_list", dataType="string")
+    cmds.setAttr(host + ".arm_ctl_list", ",".join(CONTROLS), type="string")
+
+
+def source_nested_rigs():
+    cmds.file(new=True, force=True)
+
+    for name, parent in (("rig", None),
+                         ("sub_rig", "rig"),
+                         ("arm_controlBuffer", "sub_rig"),
+                         ("arm_ctl", "arm_controlBuffer")):
+        node = cmds.createNode("transform", name=name, parent=parent)
+        if name != "arm_ctl":
+            cmds.addAttr(node, longName="is_rig", attributeType="bool")
+
+
+@with_setup(source_host)
+def test_get_controls_ik_rot():
+    """_get_controls matches _ikRot before _ik"""
+    ik_controls, fk_controls = dagmenu._get_controls(
+        "armUI_L0_ctl", "arm_blend", "arm_ctl_list")
+
+    assert_equal(ik_controls, {"ik_control": "arm_L0_ik_ctl",
+                               "pole_vector": "arm_L0_upv_ctl",
+                               "ik_rot": "arm_L0_ikRot_ctl"})
+    assert_equal(fk_controls, ["arm_L0_fk0_ctl", "arm_L0_fk1_ctl"])
+
+
+def test_match_rig_root():
+    """_match_rig_root returns the nearest root above the node"""
+    roots = set(["|grp|rig", "|grp|rig|sub_rig"])
+
+    assert_equal(dagmenu._match_rig_root("|grp|rig|sub_rig|arm_ctl", roots),
+                 "|grp|rig|sub_rig")
+    assert_equal(dagmenu._match_rig_root("|grp|rig|arm_ctl", roots),
+                 "|grp|rig")
+    assert_equal(dagmenu._match_rig_root("|grp|rig", roots), "")
+    assert_equal(dagmenu._match_rig_root("|other|arm_ctl", roots), "")
+
+
+@with_setup(source_nested_rigs)
+def test_has_nested_rig_root():
+    """_has_nested_rig_root finds the valid roots below the given root"""
+    long_name = "|rig|sub_rig|arm_controlBuffer|arm_ctl"
+
+    assert_true(dagmenu._has_nested_rig_root(long_name, "|rig"))
+    # the control buffers are not rig roots
+    assert_false(dagmenu._has_nested_rig_root(long_name, "|rig|sub_rig"))
+    assert_false(dagmenu._has_nested_rig_root("|rig|sub_rig", "|rig|sub_rig"))
+
+
+def test_ref_token():
+    """_ref_token strips the ref and Ref suffixes"""
+    assert_equal(dagmenu._ref_token("arm_L0_ikref"), "ik")
+    assert_equal(dagmenu._ref_token("arm_L0_upvRef"), "upv")
+    assert_equal(dagmenu._ref_token("neck_C0_headref"), "head")
+    assert_equal(dagmenu._ref_token("ref"), "")